@@ -1,13 +1,42 @@
-import sys
+import io
 import json
 import os
+import sys
+from contextlib import redirect_stderr, redirect_stdout
 from datetime import datetime
+from unittest import mock
+from valutatrade_hub.cli.interface import _create_parser, _parse_fast
 from valutatrade_hub.cli.interface import main as cli_main
+from valutatrade_hub.infra.database import DatabaseManager
+
+# rates.json фикстуры, сериализованный один раз; метка времени подставляется при записи
+NOW_PLACEHOLDER = "__NOW__"
+FRESH_RATES_TEMPLATE = json.dumps({
+    "pairs": {
+        pair: {"rate": rate, "updated_at": NOW_PLACEHOLDER, "source": "ParserService"}
+        for pair, rate in {
+            "EUR_USD": 0.92,
+            "BTC_USD": 62345.67,
+            "ETH_USD": 3456.78,
+            "RUB_USD": 0.0105,
+        }.items()
+    },
+    "last_refresh": NOW_PLACEHOLDER,
+    "source": "ParserService"
+}, separators=(',', ':'))
+
+# Содержимое пустых файлов данных, сериализованное заранее
+EMPTY_DATA_FILES = {
+    'session.json': b'{}',
+    'users.json': b'[]',
+    'portfolios.json': b'[]',
+}
 
 
 class FinalTester:
-    def __init__(self):
+    def __init__(self, reset=False):
         self.test_results = []
+        self.reset = reset
         self.setup_test_environment()
 
     def run_command(self, args_list, expected_error=None, check_output=None):
@@ -16,10 +45,8 @@ class FinalTester:
         if expected_error:
             print(f"  ОЖИДАЕМ ОШИБКУ: {expected_error}")
 
-        original_argv = sys.argv
         try:
-            sys.argv = ['project'] + args_list
-            result = cli_main()
+            result = cli_main(args_list)
 
             if expected_error:
                 # Проверяем что была ошибка
@@ -46,8 +73,6 @@ class FinalTester:
             else:
                 self.record_fail(f"Неожиданная ошибка: {error_msg}")
                 return False
-        finally:
-            sys.argv = original_argv
 
     def record_success(self, message):
         """Записать успешный тест"""
@@ -63,36 +88,33 @@ class FinalTester:
         """Подготовить тестовое окружение"""
         os.makedirs("data", exist_ok=True)
         os.makedirs("logs", exist_ok=True)
-        self.clear_all_data()
+        self.clear_all_data(force=self.reset)
         self.create_fresh_rates()
 
-    def clear_all_data(self):
-        """Очистить все данные"""
-        for file in ['session.json', 'users.json', 'portfolios.json']:
+    def clear_all_data(self, force=False):
+        """Очистить все данные (уже пустые файлы перезаписываются только при force)"""
+        for file, payload in EMPTY_DATA_FILES.items():
+            path = f'data/{file}'
+            try:
+                if not force and os.path.getsize(path) == len(payload):
+                    with open(path, 'rb') as f:
+                        if f.read() == payload:
+                            continue
+            except OSError:
+                pass
+
             try:
-                with open(f'data/{file}', 'w') as f:
-                    if file == 'session.json':
-                        json.dump({}, f)
-                    else:
-                        json.dump([], f)
-            except: # noqa
+                with open(path, 'wb') as f:
+                    f.write(payload)
+            except OSError:
                 pass
 
     def create_fresh_rates(self):
         """Создать свежие курсы"""
         now = datetime.now().isoformat()
-        rates_data = {
-            "pairs": {
-                "EUR_USD": {"rate": 0.92, "updated_at": now, "source": "ParserService"},
-                "BTC_USD": {"rate": 62345.67, "updated_at": now, "source": "ParserService"},
-                "ETH_USD": {"rate": 3456.78, "updated_at": now, "source": "ParserService"},
-                "RUB_USD": {"rate": 0.0105, "updated_at": now, "source": "ParserService"},
-            },
-            "last_refresh": now,
-            "source": "ParserService"
-        }
-        with open('data/rates.json', 'w', encoding='utf-8') as f:
-            json.dump(rates_data, f, indent=2)
+        payload = FRESH_RATES_TEMPLATE.replace(NOW_PLACEHOLDER, now).encode('utf-8')
+        with open('data/rates.json', 'wb') as f:
+            f.write(payload)
 
     def force_logout(self):
         """Принудительный выход"""
@@ -163,6 +185,13 @@ class FinalTester:
             expected_error="'amount' должен быть положительным"
         )
 
+        # Ошибка: сумма не является конечным положительным числом
+        for raw in ('abc', 'nan', 'inf', '-5'):
+            self.run_command(
+                ['buy', '--currency', 'BTC', '--amount', raw],
+                expected_error="'amount' должен быть положительным"
+            )
+
         # Ошибка: неизвестная валюта
         self.run_command(
             ['buy', '--currency', 'XYZ', '--amount', '10'],
@@ -215,6 +244,18 @@ class FinalTester:
         # Показать топ-2
         self.run_command(['show-rates', '--top', '2'])
 
+        # Отрицательный --top работает как срез [:N]: все пары, кроме самой дешевой
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.run_command(['show-rates', '--top', '-1'])
+        print(output.getvalue(), end='')
+        rows = [line for line in output.getvalue().splitlines() if line.startswith('  - ')]
+        expected = len(DatabaseManager().load_rates()["pairs"]) - 1
+        if len(rows) == expected:
+            self.record_success("--top -1 вывел все пары, кроме последней")
+        else:
+            self.record_fail(f"--top -1 вывел {len(rows)} пар вместо {expected}")
+
         # Показать для конкретной валюты
         self.run_command(['show-rates', '--currency', 'BTC'])
 
@@ -257,6 +298,58 @@ class FinalTester:
         # 9. Показать топ курсов
         self.run_command(['show-rates', '--top', '2'])
 
+    def test_9_failed_save_cache(self):
+        """Неудачная запись не должна оставлять правки в кеше"""
+        db = DatabaseManager()
+        users = db.load_users()
+        users.append({"user_id": -1, "username": "ghost"})
+
+        print("\n▶ save_users при ошибке записи")
+        try:
+            with mock.patch('valutatrade_hub.infra.database.open',
+                            side_effect=OSError("disk full"), create=True):
+                db.save_users(users)
+        except OSError:
+            pass
+
+        if any(user.get("username") == "ghost" for user in db.load_users()):
+            self.record_fail("Кеш вернул данные, которые не удалось записать")
+        else:
+            self.record_success("После неудачной записи прочитаны данные с диска")
+
+    def test_10_argument_parsing(self):
+        """Быстрый разбор совпадает с argparse, нетипичные формы уходят в argparse"""
+        fast_cases = [
+            ['buy', '--currency', 'BTC', '--amount', '0.01'],
+            ['show-rates', '--top', '-1'],
+            ['get-rate', '--to', 'BTC', '--from', 'USD'],
+            ['show-portfolio'],
+        ]
+        fallback_cases = [
+            ['get-rate', '--from=USD', '--to=BTC'],
+            ['show-rates', '--top', 'two'],
+            ['get-rate', '--from', 'USD'],
+        ]
+
+        for argv in fast_cases + fallback_cases:
+            print(f"\n▶ РАЗБОР: {' '.join(argv)}")
+            fast = _parse_fast(argv)
+            try:
+                with redirect_stderr(io.StringIO()):
+                    expected = vars(_create_parser(argv[0]).parse_args(argv))
+            except SystemExit:
+                expected = None
+
+            if argv in fallback_cases:
+                if fast is None:
+                    self.record_success("Разбор передан argparse")
+                else:
+                    self.record_fail("Быстрый разбор принял нетипичную форму")
+            elif fast is not None and vars(fast) == expected:
+                self.record_success("Быстрый разбор совпал с argparse")
+            else:
+                self.record_fail(f"Быстрый разбор: {fast}, argparse: {expected}")
+
     def run_all_tests(self):
         """Запустить все тесты"""
         print("\n" + "=" * 60)
@@ -272,6 +365,8 @@ class FinalTester:
             ("Работа с курсами", self.test_6_rate_operations),
             ("Обновление курсов", self.test_7_update_rates),
             ("Полный workflow (ТЗ)", self.test_8_full_workflow_tz),
+            ("Кеш при ошибке записи", self.test_9_failed_save_cache),
+            ("Разбор аргументов", self.test_10_argument_parsing),
         ]
 
         for name, test_func in test_suites:
@@ -310,7 +405,8 @@ class FinalTester:
 
 
 def main():
-    tester = FinalTester()
+    # --reset: принудительно перезаписать файлы данных, даже если они уже пусты
+    tester = FinalTester(reset='--reset' in sys.argv[1:])
     tester.run_all_tests()
 
 
@@ -1,22 +1,31 @@
-import argparse
+import functools
+import heapq
+import math
+import re
 import sys
 from datetime import datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional
 
+from ..core.models import placeholder_rates_to
 from ..core.usecases import UserUseCases, PortfolioUseCases, RatesUseCases
 from ..core.utils import SessionManager
 from ..core.exceptions import InsufficientFundsError, CurrencyNotFoundError
-from ..parser_service.updater import RatesUpdater
-from ..parser_service.config import ParserConfig
 from ..logging_config import setup_logging
 
+if TYPE_CHECKING:
+    # argparse нужен только запасному пути разбора и импортируется там же
+    import argparse
+
 
 def handle_update_rates(source: str = None) -> int:
     """Обработка команды update-rates с реальными API запросами"""
     print("INFO: Starting rates update...")
 
     try:
-         # Настраиваем логирование
-        setup_logging()
+        # Сервис парсинга тянет за собой requests — импортируем только для этой команды
+        from ..parser_service.updater import RatesUpdater
+        from ..parser_service.config import ParserConfig
 
         # Создаем конфигурацию с вашим API ключом
         config = ParserConfig()
@@ -37,8 +46,8 @@ def handle_update_rates(source: str = None) -> int:
         updated_count = updater.run_update(source)
 
         if updated_count > 0:
-            print(
-                f"Update successful. Total rates updated: {updated_count}. Last refresh: {datetime.now().isoformat()}")
+            print(f"Update successful. Total rates updated: {updated_count}. "
+                  f"Last refresh: {updater.last_refresh}")
             return 0
         else:
             print("Update completed with errors. Check logs/parser.log for details.")
@@ -53,10 +62,22 @@ def handle_update_rates(source: str = None) -> int:
         return 1
 
 
+# Тестовые курсы для мок-обновления: пара -> (курс, источник)
+_MOCK_RATES = {
+    "EUR_USD": (0.92, "MockService"),
+    "BTC_USD": (62345.67, "MockService"),
+    "ETH_USD": (3456.78, "MockService"),
+    "RUB_USD": (0.0105, "MockService"),
+    "GBP_USD": (1.25, "MockService"),
+    "JPY_USD": (0.0067, "MockService"),
+    "CNY_USD": (0.14, "MockService"),
+    "USD_USD": (1.0, "System"),
+}
+
+
 def mock_update_rates():
     """Мок-обновление курсов для тестирования"""
     from ..infra.database import DatabaseManager
-    from datetime import datetime
 
     print("INFO: Using mock update (no real API calls)...")
 
@@ -65,99 +86,127 @@ def mock_update_rates():
     # Создаем реалистичные тестовые данные
     rates_data = {
         "pairs": {
-            "EUR_USD": {"rate": 0.92, "updated_at": now, "source": "MockService"},
-            "BTC_USD": {"rate": 62345.67, "updated_at": now, "source": "MockService"},
-            "ETH_USD": {"rate": 3456.78, "updated_at": now, "source": "MockService"},
-            "RUB_USD": {"rate": 0.0105, "updated_at": now, "source": "MockService"},
-            "GBP_USD": {"rate": 1.25, "updated_at": now, "source": "MockService"},
-            "JPY_USD": {"rate": 0.0067, "updated_at": now, "source": "MockService"},
-            "CNY_USD": {"rate": 0.14, "updated_at": now, "source": "MockService"},
-            "USD_USD": {"rate": 1.0, "updated_at": now, "source": "System"},
+            pair: {"rate": rate, "updated_at": now, "source": source}
+            for pair, (rate, source) in _MOCK_RATES.items()
         },
         "last_refresh": now,
         "source": "MockService"
     }
 
-    # Сохраняем
+    # Сохраняем все пары одной записью файла
     db = DatabaseManager()
     db.save_rates(rates_data)
 
-    print("INFO: Mock rates updated successfully")
-    print(f"Update successful. Total rates updated: {len(rates_data['pairs'])}. Last refresh: {now}")
+    sys.stdout.write(
+        "INFO: Mock rates updated successfully\n"
+        f"Update successful. Total rates updated: {len(rates_data['pairs'])}. Last refresh: {now}\n"
+    )
     return 0
 
 
-def main():
-    parser = argparse.ArgumentParser(description="ValutaTrade Hub - Валютный кошелек")
-    subparsers = parser.add_subparsers(dest='command', help='Доступные команды')
+def _sniff_subcommand(argv: List[str]) -> Optional[str]:
+    """Найти вызываемую подкоманду в argv, не строя парсер"""
+    for token in argv:
+        if token in ('-h', '--help'):
+            return None
+        if not token.startswith('-'):
+            return token if token in _SUBCOMMANDS else None
+    return None
+
+
+# Значение, начинающееся с '-', argparse принимает только если это отрицательное число
+_NEGATIVE_NUMBER = re.compile(r'^-\d+$|^-\d*\.\d+$')
+
+
+def _parse_fast(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Разобрать типичный вызов '<команда> --флаг значение ...' без argparse.
+
+    Возвращает None при любом отклонении от этой формы (справка, '--флаг=значение',
+    неизвестный или повторный флаг, неверный тип, нет обязательного аргумента) —
+    тогда разбор и сообщения об ошибках остаются за argparse. Результат имеет
+    те же атрибуты, что и argparse.Namespace, но не требует импорта argparse.
+    """
+    if not argv or argv[0] not in _SUBCOMMANDS:
+        return None
+
+    command = argv[0]
+    specs = dict(_SUBCOMMANDS[command].arguments)
+    tokens = argv[1:]
+    if len(tokens) % 2:
+        return None
+
+    raw_values = {}
+    for flag, raw in zip(tokens[::2], tokens[1::2]):
+        if flag not in specs or flag in raw_values:
+            return None
+        if raw.startswith('-') and not _NEGATIVE_NUMBER.match(raw):
+            return None
+        raw_values[flag] = raw
+
+    args = SimpleNamespace(command=command)
+    for flag, options in specs.items():
+        dest = options.get('dest', flag.lstrip('-').replace('-', '_'))
+        if flag in raw_values:
+            try:
+                value = options.get('type', str)(raw_values[flag])
+            except ValueError:
+                return None
+        elif options.get('required'):
+            return None
+        else:
+            value = options.get('default')
+        setattr(args, dest, value)
 
-    # register
-    register_parser = subparsers.add_parser('register', help='Регистрация нового пользователя')
-    register_parser.add_argument('--username', type=str, required=True, help='Имя пользователя')
-    register_parser.add_argument('--password', type=str, required=True, help='Пароль')
+    return args
 
-    # login
-    login_parser = subparsers.add_parser('login', help='Вход в систему')
-    login_parser.add_argument('--username', type=str, required=True, help='Имя пользователя')
-    login_parser.add_argument('--password', type=str, required=True, help='Пароль')
 
-    # show-portfolio
-    portfolio_parser = subparsers.add_parser('show-portfolio', help='Показать портфель')
-    portfolio_parser.add_argument('--base', type=str, default='USD', help='Базовая валюта (по умолчанию USD)')
+@functools.cache
+def _create_parser(command: Optional[str] = None) -> 'argparse.ArgumentParser':
+    """
+    Построить парсер аргументов (один раз на процесс для каждой подкоманды).
 
-    # buy
-    buy_parser = subparsers.add_parser('buy', help='Купить валюту')
-    buy_parser.add_argument('--currency', type=str, required=True, help='Код покупаемой валюты')
-    buy_parser.add_argument('--amount', type=float, required=True, help='Количество покупаемой валюты')
+    Регистрируются все подкоманды, чтобы общая справка и сообщения об ошибках
+    перечисляли их полностью, но аргументы добавляются только к вызываемой
+    подкоманде — остальные подпарсеры остаются пустыми заглушками.
+    """
+    import argparse
 
-    # sell
-    sell_parser = subparsers.add_parser('sell', help='Продать валюту')
-    sell_parser.add_argument('--currency', type=str, required=True, help='Код продаваемой валюты')
-    sell_parser.add_argument('--amount', type=float, required=True, help='Количество продаваемой валюты')
+    parser = argparse.ArgumentParser(description="ValutaTrade Hub - Валютный кошелек")
+    subparsers = parser.add_subparsers(dest='command', help='Доступные команды')
 
-    # get-rate
-    rate_parser = subparsers.add_parser('get-rate', help='Получить курс валюты')
-    rate_parser.add_argument('--from', type=str, required=True, dest='from_currency', help='Исходная валюта')
-    rate_parser.add_argument('--to', type=str, required=True, dest='to_currency', help='Целевая валюта')
+    for name, subcommand in _SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(name, help=subcommand.help)
+        if name == command:
+            for flag, options in subcommand.arguments:
+                subparser.add_argument(flag, **options)
 
-    # update-rates
-    subparsers.add_parser('update-rates', help='Обновить курсы валют')
+    return parser
 
-    # show-rates
-    show_rates_parser = subparsers.add_parser('show-rates', help='Показать курсы валют')
-    show_rates_parser.add_argument('--currency', type=str, help='Показать курс только для указанной валюты')
-    show_rates_parser.add_argument('--top', type=int, help='Показать N самых дорогих криптовалют')
-    show_rates_parser.add_argument('--base', type=str, help='Показать все курсы относительно указанной базы')
 
-    args = parser.parse_args()
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI; argv по умолчанию берется из sys.argv"""
+    if argv is None:
+        argv = sys.argv[1:]
 
-    if not args.command:
-        parser.print_help()
-        return 1
+    args = _parse_fast(argv)
+    if args is None:
+        parser = _create_parser(_sniff_subcommand(argv))
+        args = parser.parse_args(argv)
+
+        if not args.command:
+            parser.print_help()
+            return 1
+
+    # Логи (и их файлы) нужны только для реальной команды, не для справки
+    setup_logging()
 
     try:
-        if args.command == 'register':
-            return handle_register(args.username, args.password)
-        elif args.command == 'login':
-            return handle_login(args.username, args.password)
-        elif args.command == 'show-portfolio':
-            return handle_show_portfolio(args.base)
-        elif args.command == 'buy':
-            return handle_buy(args.currency, args.amount)
-        elif args.command == 'sell':
-            return handle_sell(args.currency, args.amount)
-        elif args.command == 'get-rate':
-            return handle_get_rate(args.from_currency, args.to_currency)
-        elif args.command == 'update-rates':
-            return handle_update_rates()
-        elif args.command == 'show-rates':
-            return handle_show_rates(args.currency, args.top, args.base)
+        return _SUBCOMMANDS[args.command].handler(args)
     except Exception as e:
         print(f"Ошибка: {str(e)}")
         return 1
 
-    return 0
-
 
 def handle_register(username: str, password: str) -> int:
     try:
@@ -192,54 +241,65 @@ def handle_show_portfolio(base_currency: str) -> int:
         print("Портфель пуст")
         return 0
 
-    print(f"Портфель пользователя '{user.username}' (база: {base_currency}):")
+    # Курсы к базовой валюте строятся один раз, а не по ключу на каждый кошелек
+    rates = placeholder_rates_to(base_currency)
 
-    total_value = 0
+    # Сначала собираем строки (код, баланс, стоимость), затем суммируем через fsum
+    rows = []
     for currency_code, wallet in portfolio.wallets.items():
-        # Временная заглушка для конвертации
-        exchange_rates = {
-            "EUR_USD": 1.0786,
-            "BTC_USD": 59337.21,
-            "RUB_USD": 0.01016,
-            "ETH_USD": 3720.00,
-            "USD_USD": 1.0
-        }
-
-        rate_key = f"{currency_code}_{base_currency}"
-        if rate_key in exchange_rates:
-            rate = exchange_rates[rate_key]
-            value = wallet.balance * rate
-            total_value += value
-            print(f"- {currency_code}: {wallet.balance:.2f} → {value:.2f} {base_currency}")
-        elif currency_code == base_currency:
-            total_value += wallet.balance
-            print(f"- {currency_code}: {wallet.balance:.2f} → {wallet.balance:.2f} {base_currency}")
-
-    print(f"\nИТОГО: {total_value:,.2f} {base_currency}")
+        rate = rates.get(currency_code)
+        if rate is not None:
+            rows.append((currency_code, wallet.balance, wallet.balance * rate))
+
+    total_value = math.fsum(value for _, _, value in rows)
+
+    # Отчет выводится одной записью в stdout
+    lines = [f"Портфель пользователя '{user.username}' (база: {base_currency}):"]
+    lines.extend(
+        f"- {currency_code}: {balance:.2f} → {value:.2f} {base_currency}"
+        for currency_code, balance, value in rows
+    )
+    lines.append(f"\nИТОГО: {total_value:,.2f} {base_currency}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return 0
 
 
-def handle_buy(currency: str, amount: float) -> int:
+def _parse_amount(raw: str) -> Optional[float]:
+    """Разобрать значение --amount; None, если это не положительное число"""
+    try:
+        amount = float(raw)
+    except ValueError:
+        return None
+    return amount if math.isfinite(amount) and amount > 0 else None
+
+
+def handle_buy(currency: str, raw_amount: str) -> int:
     if not SessionManager.is_logged_in():
         print("Сначала выполните login")
         return 1
 
-    if amount <= 0:
+    amount = _parse_amount(raw_amount)
+    if amount is None:
         print("'amount' должен быть положительным числом")
         return 1
 
     try:
         user = SessionManager.get_current_user()
-        portfolio, rate = PortfolioUseCases.buy_currency(user.user_id, currency.upper(), amount)
+        code = currency.upper()
+        portfolio, rate = PortfolioUseCases.buy_currency(user.user_id, code, amount)
 
         estimated_cost = amount * rate
 
-        print(f"Покупка выполнена: {amount:.4f} {currency} по курсу ${rate:.2f} USD/{currency}")
-        print("\nИзменения в портфеле:")
+        wallet = portfolio.get_wallet(code)
 
-        wallet = portfolio.get_wallet(currency.upper())
-        print(f"- {currency}: было 0.0000 → стало {wallet.balance:.4f}")
-        print(f"Оценочная стоимость покупки: {estimated_cost:,.2f} USD")
+        # Итог операции выводится одной записью в stdout
+        lines = [
+            f"Покупка выполнена: {amount:.4f} {currency} по курсу ${rate:.2f} USD/{currency}",
+            "\nИзменения в портфеле:",
+            f"- {currency}: было 0.0000 → стало {wallet.balance:.4f}",
+            f"Оценочная стоимость покупки: {estimated_cost:,.2f} USD",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
 
         return 0
     except ValueError as e:
@@ -247,31 +307,38 @@ def handle_buy(currency: str, amount: float) -> int:
         return 1
 
 
-def handle_sell(currency: str, amount: float) -> int:
+def handle_sell(currency: str, raw_amount: str) -> int:
     if not SessionManager.is_logged_in():
         print("Сначала выполните login")
         return 1
 
-    if amount <= 0:
+    amount = _parse_amount(raw_amount)
+    if amount is None:
         print("'amount' должен быть положительным числом")
         return 1
 
     try:
         user = SessionManager.get_current_user()
-        portfolio, rate = PortfolioUseCases.sell_currency(user.user_id, currency.upper(), amount)
+        code = currency.upper()
+        portfolio, rate = PortfolioUseCases.sell_currency(user.user_id, code, amount)
 
         estimated_revenue = amount * rate
 
-        print(f"Продажа выполнена: {amount:.4f} {currency} по курсу {rate:.2f} USD/{currency}")
-        print("\nИзменения в портфеле:")
-
-        wallet = portfolio.get_wallet(currency.upper())
+        wallet = portfolio.get_wallet(code)
         if wallet:
-            print(f"- {currency}: было {wallet.balance + amount:.4f} → стало {wallet.balance:.4f}")
+            change = (f"- {currency}: было {wallet.balance + amount:.4f} "
+                      f"→ стало {wallet.balance:.4f}")
         else:
-            print(f"- {currency}: было {amount:.4f} → стало 0.0000")
+            change = f"- {currency}: было {amount:.4f} → стало 0.0000"
 
-        print(f"Оценочная выручка: {estimated_revenue:,.2f} USD")
+        # Итог операции выводится одной записью в stdout
+        lines = [
+            f"Продажа выполнена: {amount:.4f} {currency} по курсу {rate:.2f} USD/{currency}",
+            "\nИзменения в портфеле:",
+            change,
+            f"Оценочная выручка: {estimated_revenue:,.2f} USD",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
 
         return 0
 
@@ -291,20 +358,19 @@ def handle_sell(currency: str, amount: float) -> int:
 
 
 def handle_get_rate(from_currency: str, to_currency: str) -> int:
+    from_code = from_currency.upper()
+    to_code = to_currency.upper()
     try:
-        rate, updated_at = RatesUseCases.get_rate(
-            from_currency.upper(),
-            to_currency.upper()
-        )
+        rate, updated_at = RatesUseCases.get_rate(from_code, to_code)
 
-        reverse_rate = 1 / rate if rate != 0 else 0
+        reverse_rate = 1.0 / rate if rate else 0.0
 
-        print(f"Курс {from_currency.upper()}={to_currency.upper()}: {rate:.6f} (обновлено: {updated_at})")
-        print(f"Обратный курс {to_currency.upper()}={from_currency.upper()}: {reverse_rate:.6f}")
+        print(f"Курс {from_code}={to_code}: {rate:.6f} (обновлено: {updated_at})")
+        print(f"Обратный курс {to_code}={from_code}: {reverse_rate:.6f}")
 
         return 0
     except ValueError:
-        print(f"Курс {from_currency.upper()}={to_currency.upper()} недоступен. Повторите попытку позже...")
+        print(f"Курс {from_code}={to_code} недоступен. Повторите попытку позже...")
         return 1
 
 
@@ -321,7 +387,8 @@ def handle_show_rates(currency: str = None, top: int = None, base: str = None) -
     pairs = rates["pairs"]
 
     if currency:
-        filtered_pairs = {k: v for k, v in pairs.items() if currency.upper() in k}
+        needle = currency.upper()
+        filtered_pairs = {k: v for k, v in pairs.items() if needle in k}
         if not filtered_pairs:
             print(f"Курс для '{currency}' не найден в кеше.")
             return 1
@@ -329,15 +396,99 @@ def handle_show_rates(currency: str = None, top: int = None, base: str = None) -
 
     print(f"Rates from cache (updated at {rates.get('last_refresh', 'N/A')}):")
 
-    sorted_pairs = sorted(pairs.items())
-    if top:
+    if top and top > 0:
+        # Для --top достаточно частичного отбора: O(N log k) вместо полной сортировки
+        sorted_pairs = heapq.nlargest(top, pairs.items(), key=lambda x: x[1]["rate"])
+    elif top:
+        # Отрицательный N сохраняет прежнюю семантику среза [:N]
         sorted_pairs = sorted(pairs.items(), key=lambda x: x[1]["rate"], reverse=True)[:top]
+    else:
+        sorted_pairs = sorted(pairs.items())
 
-    for pair, data in sorted_pairs:
-        print(f"  - {pair}: {data['rate']}")
+    if sorted_pairs:
+        # Одна запись в stdout вместо print на каждую пару
+        rows = (f"  - {pair}: {data['rate']}" for pair, data in sorted_pairs)
+        sys.stdout.write("\n".join(rows) + "\n")
 
     return 0
 
 
+class _Subcommand(NamedTuple):
+    """Описание подкоманды: справка, аргументы argparse и обработчик"""
+    help: str
+    arguments: tuple  # ((флаг, параметры add_argument), ...)
+    handler: Callable[['argparse.Namespace'], int]
+
+
+# Аргументы, общие для register и login
+_CREDENTIAL_ARGS = (
+    ('--username', {'type': str, 'required': True, 'help': 'Имя пользователя'}),
+    ('--password', {'type': str, 'required': True, 'help': 'Пароль'}),
+)
+
+
+# Подкоманды CLI — единый источник для разбора аргументов и диспетчеризации
+_SUBCOMMANDS = {
+    'register': _Subcommand(
+        'Регистрация нового пользователя',
+        _CREDENTIAL_ARGS,
+        lambda args: handle_register(args.username, args.password),
+    ),
+    'login': _Subcommand(
+        'Вход в систему',
+        _CREDENTIAL_ARGS,
+        lambda args: handle_login(args.username, args.password),
+    ),
+    'show-portfolio': _Subcommand(
+        'Показать портфель',
+        (
+            ('--base', {'type': str, 'default': 'USD',
+                        'help': 'Базовая валюта (по умолчанию USD)'}),
+        ),
+        lambda args: handle_show_portfolio(args.base),
+    ),
+    'buy': _Subcommand(
+        'Купить валюту',
+        (
+            ('--currency', {'type': str, 'required': True, 'help': 'Код покупаемой валюты'}),
+            ('--amount', {'type': str, 'required': True, 'help': 'Количество покупаемой валюты'}),
+        ),
+        lambda args: handle_buy(args.currency, args.amount),
+    ),
+    'sell': _Subcommand(
+        'Продать валюту',
+        (
+            ('--currency', {'type': str, 'required': True, 'help': 'Код продаваемой валюты'}),
+            ('--amount', {'type': str, 'required': True, 'help': 'Количество продаваемой валюты'}),
+        ),
+        lambda args: handle_sell(args.currency, args.amount),
+    ),
+    'get-rate': _Subcommand(
+        'Получить курс валюты',
+        (
+            ('--from', {'type': str, 'required': True, 'dest': 'from_currency',
+                        'help': 'Исходная валюта'}),
+            ('--to', {'type': str, 'required': True, 'dest': 'to_currency',
+                      'help': 'Целевая валюта'}),
+        ),
+        lambda args: handle_get_rate(args.from_currency, args.to_currency),
+    ),
+    'update-rates': _Subcommand(
+        'Обновить курсы валют',
+        (),
+        lambda args: handle_update_rates(),
+    ),
+    'show-rates': _Subcommand(
+        'Показать курсы валют',
+        (
+            ('--currency', {'type': str, 'help': 'Показать курс только для указанной валюты'}),
+            ('--top', {'type': int, 'help': 'Показать N самых дорогих криптовалют'}),
+            ('--base', {'type': str, 'help': 'Показать все курсы относительно указанной базы'}),
+        ),
+        lambda args: handle_show_rates(args.currency, args.top, args.base),
+    ),
+}
+
+
 if __name__ == "__main__":
     sys.exit(main())
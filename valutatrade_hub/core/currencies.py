@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Tuple
 from .exceptions import CurrencyNotFoundError
 
 
 class Currency(ABC):
+    # Фиксированный набор атрибутов: без __dict__ у экземпляров
+    __slots__ = ('__code', '__name', '__str')
+
     def __init__(self, name: str, code: str):
         if not name or not name.strip():
             raise ValueError("Название валюты не может быть пустым")
@@ -12,6 +15,8 @@ class Currency(ABC):
 
         self.__name = name.strip()
         self.__code = code.upper()
+        # Валюта неизменяема — строковые представления строим один раз
+        self.__str = f"{self.__code} - {self.__name}"
 
     @property
     def name(self) -> str:
@@ -26,27 +31,36 @@ class Currency(ABC):
         pass
 
     def __str__(self) -> str:
-        return f"{self.__code} - {self.__name}"
+        return self.__str
 
 
 class FiatCurrency(Currency):
+    __slots__ = ('__display_info', '__issuing_country')
+
     def __init__(self, name: str, code: str, issuing_country: str):
         super().__init__(name, code)
         self.__issuing_country = issuing_country
+        self.__display_info = f"[FIAT] {self.code} — {self.name} (Issuing: {issuing_country})"
 
     @property
     def issuing_country(self) -> str:
         return self.__issuing_country
 
     def get_display_info(self) -> str:
-        return f"[FIAT] {self.code} — {self.name} (Issuing: {self.__issuing_country})"
+        return self.__display_info
 
 
 class CryptoCurrency(Currency):
+    __slots__ = ('__algorithm', '__display_info', '__market_cap')
+
     def __init__(self, name: str, code: str, algorithm: str, market_cap: float = 0.0):
         super().__init__(name, code)
         self.__algorithm = algorithm
         self.__market_cap = market_cap
+        self.__display_info = (
+            f"[CRYPTO] {self.code} — {self.name} "
+            f"(Algo: {algorithm}, MCAP: {self._format_market_cap(market_cap)})"
+        )
 
     @property
     def algorithm(self) -> str:
@@ -56,41 +70,48 @@ class CryptoCurrency(Currency):
     def market_cap(self) -> float:
         return self.__market_cap
 
+    @staticmethod
+    def _format_market_cap(market_cap: float) -> str:
+        return f"{market_cap:.2e}" if market_cap > 1e6 else f"{market_cap:,.2f}"
+
     def get_display_info(self) -> str:
-        mcap_str = f"{self.__market_cap:.2e}" if self.__market_cap > 1e6 else f"{self.__market_cap:,.2f}"
-        return f"[CRYPTO] {self.code} — {self.name} (Algo: {self.__algorithm}, MCAP: {mcap_str})"
+        return self.__display_info
 
 
 # Реестр валют (фабрика)
 class CurrencyRegistry:
-    _currencies: Dict[str, Currency] = {}
-
-    @classmethod
-    def initialize(cls):
-        """Инициализация реестра валют"""
-        if not cls._currencies:
-            # Фиатные валюты
-            cls._currencies["USD"] = FiatCurrency("US Dollar", "USD", "United States")
-            cls._currencies["EUR"] = FiatCurrency("Euro", "EUR", "Eurozone")
-            cls._currencies["RUB"] = FiatCurrency("Russian Ruble", "RUB", "Russia")
-            cls._currencies["GBP"] = FiatCurrency("British Pound", "GBP", "United Kingdom")
-
-            # Криптовалюты
-            cls._currencies["BTC"] = CryptoCurrency("Bitcoin", "BTC", "SHA-256", 1.12e12)
-            cls._currencies["ETH"] = CryptoCurrency("Ethereum", "ETH", "Ethash", 4.5e11)
-            cls._currencies["SOL"] = CryptoCurrency("Solana", "SOL", "Proof of History", 6.7e10)
+    # Реестр заполняется один раз при определении класса
+    _currencies: Dict[str, Currency] = {
+        # Фиатные валюты
+        "USD": FiatCurrency("US Dollar", "USD", "United States"),
+        "EUR": FiatCurrency("Euro", "EUR", "Eurozone"),
+        "RUB": FiatCurrency("Russian Ruble", "RUB", "Russia"),
+        "GBP": FiatCurrency("British Pound", "GBP", "United Kingdom"),
+
+        # Криптовалюты
+        "BTC": CryptoCurrency("Bitcoin", "BTC", "SHA-256", 1.12e12),
+        "ETH": CryptoCurrency("Ethereum", "ETH", "Ethash", 4.5e11),
+        "SOL": CryptoCurrency("Solana", "SOL", "Proof of History", 6.7e10),
+    }
+
+    # Реестр неизменяем, поэтому кортеж кодов строится один раз
+    _codes: Tuple[str, ...] = tuple(_currencies)
 
     @classmethod
     def get_currency(cls, code: str) -> Currency:
         """Получить валюту по коду"""
-        cls.initialize()
-        currency = cls._currencies.get(code.upper())
-        if not currency:
-            raise CurrencyNotFoundError(code.upper())
-        return currency
+        # Быстрый путь: CLI и use cases уже передают код в верхнем регистре
+        currency = cls._currencies.get(code)
+        if currency is not None:
+            return currency
+
+        normalized = code.upper()
+        try:
+            return cls._currencies[normalized]
+        except KeyError:
+            raise CurrencyNotFoundError(normalized) from None
 
     @classmethod
-    def get_all_codes(cls) -> list:
+    def get_all_codes(cls) -> Tuple[str, ...]:
         """Получить все коды валют"""
-        cls.initialize()
-        return list(cls._currencies.keys())
\ No newline at end of file
+        return cls._codes
\ No newline at end of file
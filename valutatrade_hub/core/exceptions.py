@@ -3,16 +3,29 @@ class InsufficientFundsError(Exception):
         self.available = available
         self.required = required
         self.code = code
-        super().__init__(f"Недостаточно средств: доступно {available} {code}, требуется {required} {code}")
+        # Сообщение собирается только при str(), а не при каждом raise
+        super().__init__(available, required, code)
+
+    def __str__(self) -> str:
+        return (
+            f"Недостаточно средств: доступно {self.available} {self.code}, "
+            f"требуется {self.required} {self.code}"
+        )
 
 
 class CurrencyNotFoundError(Exception):
     def __init__(self, code: str):
         self.code = code
-        super().__init__(f"Неизвестная валюта '{code}'")
+        super().__init__(code)
+
+    def __str__(self) -> str:
+        return f"Неизвестная валюта '{self.code}'"
 
 
 class ApiRequestError(Exception):
     def __init__(self, reason: str):
         self.reason = reason
-        super().__init__(f"Ошибка при обращении к внешнему API: {reason}")
\ No newline at end of file
+        super().__init__(reason)
+
+    def __str__(self) -> str:
+        return f"Ошибка при обращении к внешнему API: {self.reason}"
\ No newline at end of file
@@ -1,16 +1,50 @@
+import functools
 import hashlib
+import hmac
+import secrets
+import sys
 from datetime import datetime
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Union
+
+# Временная заглушка курсов — в реальности будет использоваться rates.json
+PLACEHOLDER_RATES = {
+    "EUR_USD": 1.0786,
+    "BTC_USD": 59337.21,
+    "RUB_USD": 0.01016,
+    "ETH_USD": 3720.00,
+    "USD_USD": 1.0
+}
+
+
+@functools.lru_cache(maxsize=32)
+def placeholder_rates_to(base_currency: str) -> Mapping[str, float]:
+    """Курсы заглушки к базовой валюте: {код: курс}, сама база — по курсу 1"""
+    rates = {base_currency: 1.0}
+    for pair, rate in PLACEHOLDER_RATES.items():
+        code, quote = pair.rsplit("_", 1)
+        if quote == base_currency:
+            rates[code] = rate
+    return MappingProxyType(rates)
 
 
 class User:
+    __slots__ = ('__hashed_password', '__registration_date', '__registration_iso',
+                 '__salt', '__user_id', '__username')
+
     def __init__(self, user_id: int, username: str, hashed_password: str,
-                 salt: str, registration_date: datetime):
+                 salt: str, registration_date: Union[datetime, str]):
         self.__user_id = user_id
         self.__username = username
         self.__hashed_password = hashed_password
         self.__salt = salt
-        self.__registration_date = registration_date
+        # Из JSON дата приходит ISO-строкой — разбираем ее только при обращении
+        if isinstance(registration_date, str):
+            self.__registration_date = None
+            self.__registration_iso = registration_date
+        else:
+            self.__registration_date = registration_date
+            self.__registration_iso = None
 
     @property
     def user_id(self) -> int:
@@ -22,9 +56,10 @@ class User:
 
     @username.setter
     def username(self, value: str):
-        if not value or not value.strip():
+        stripped = value.strip() if value else ""
+        if not stripped:
             raise ValueError("Имя не может быть пустым")
-        self.__username = value
+        self.__username = stripped
 
     @property
     def hashed_password(self) -> str:
@@ -36,12 +71,14 @@ class User:
 
     @property
     def registration_date(self) -> datetime:
+        if self.__registration_date is None:
+            self.__registration_date = datetime.fromisoformat(self.__registration_iso)
         return self.__registration_date
 
     def get_user_info(self) -> str:
         return (f"ID: {self.__user_id}, "
                 f"Имя: {self.__username}, "
-                f"Дата регистрации: {self.__registration_date}")
+                f"Дата регистрации: {self.registration_date}")
 
     def change_password(self, new_password: str):
         if len(new_password) < 4:
@@ -54,7 +91,8 @@ class User:
 
     def verify_password(self, password: str) -> bool:
         hashed_input = self.__hash_password(password, self.__salt)
-        return hashed_input == self.__hashed_password
+        # Сравнение за постоянное время не выдает длину совпавшего префикса
+        return hmac.compare_digest(hashed_input, self.__hashed_password)
 
     def to_dict(self) -> Dict:
         return {
@@ -62,17 +100,20 @@ class User:
             "username": self.__username,
             "hashed_password": self.__hashed_password,
             "salt": self.__salt,
-            "registration_date": self.__registration_date.isoformat()
+            "registration_date": self.__registration_iso or self.__registration_date.isoformat()
         }
 
     @staticmethod
     def __generate_salt() -> str:
-        import secrets
         return secrets.token_hex(8)
 
     @staticmethod
     def __hash_password(password: str, salt: str) -> str:
-        return hashlib.sha256((password + salt).encode()).hexdigest()
+        # Пароль и соль подаются в хеш по частям, без промежуточной строки;
+        # дайджест тот же, что у sha256((password + salt).encode())
+        h = hashlib.sha256(password.encode())
+        h.update(salt.encode())
+        return h.hexdigest()
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'User':
@@ -81,19 +122,16 @@ class User:
             username=data["username"],
             hashed_password=data["hashed_password"],
             salt=data["salt"],
-            registration_date=datetime.fromisoformat(data["registration_date"])
+            registration_date=data["registration_date"]
         )
 
-    @username.setter
-    def username(self, value: str):
-        if not value or not value.strip():
-            raise ValueError("Имя не может быть пустым")
-        self.__username = value.strip()  # Добавим strip()
-
 
 class Wallet:
+    __slots__ = ('__balance', '__currency_code')
+
     def __init__(self, currency_code: str, balance: float = 0.0):
-        self.__currency_code = currency_code
+        # Один общий объект строки на код: экономия памяти и быстрые сравнения
+        self.__currency_code = sys.intern(currency_code)
         self.__balance = balance
 
     @property
@@ -115,14 +153,17 @@ class Wallet:
     def deposit(self, amount: float):
         if amount <= 0:
             raise ValueError("Сумма пополнения должна быть положительной")
-        self.balance = self.__balance + amount
+        # Сумма уже проверена: положительное пополнение не сделает баланс
+        # отрицательным, поэтому проверки сеттера balance не нужны
+        self.__balance = float(self.__balance + amount)
 
     def withdraw(self, amount: float):
         if amount <= 0:
             raise ValueError("Сумма снятия должна быть положительной")
         if amount > self.__balance:
             raise ValueError(f"Недостаточно средств. Доступно: {self.__balance}")
-        self.balance = self.__balance - amount
+        # amount <= баланса проверено выше — результат неотрицателен
+        self.__balance = float(self.__balance - amount)
 
     def get_balance_info(self) -> str:
         return f"{self.__currency_code}: {self.__balance:.4f}"
@@ -142,6 +183,8 @@ class Wallet:
 
 
 class Portfolio:
+    __slots__ = ('__user_id', '__wallets')
+
     def __init__(self, user_id: int, wallets: Optional[Dict[str, Wallet]] = None):
         self.__user_id = user_id
         self.__wallets = wallets or {}
@@ -151,38 +194,29 @@ class Portfolio:
         return self.__user_id
 
     @property
-    def wallets(self) -> Dict[str, Wallet]:
-        return self.__wallets.copy()
+    def wallets(self) -> Mapping[str, Wallet]:
+        # Представление только для чтения: отражает изменения без копирования
+        return MappingProxyType(self.__wallets)
 
     def add_currency(self, currency_code: str) -> Wallet:
         if currency_code in self.__wallets:
             raise ValueError(f"Валюта {currency_code} уже есть в портфеле")
 
         wallet = Wallet(currency_code)
-        self.__wallets[currency_code] = wallet
+        self.__wallets[wallet.currency_code] = wallet
         return wallet
 
     def get_wallet(self, currency_code: str) -> Optional[Wallet]:
         return self.__wallets.get(currency_code)
 
     def get_total_value(self, base_currency: str = 'USD') -> float:
-        # Временная заглушка - в реальности будет использоваться rates.json
-        exchange_rates = {
-            "EUR_USD": 1.0786,
-            "BTC_USD": 59337.21,
-            "RUB_USD": 0.01016,
-            "ETH_USD": 3720.00,
-            "USD_USD": 1.0
-        }
+        rates = placeholder_rates_to(base_currency)
 
         total = 0.0
         for wallet in self.__wallets.values():
-            rate_key = f"{wallet.currency_code}_{base_currency}"
-            if rate_key in exchange_rates:
-                rate = exchange_rates[rate_key]
+            rate = rates.get(wallet.currency_code)
+            if rate is not None:
                 total += wallet.balance * rate
-            elif wallet.currency_code == base_currency:
-                total += wallet.balance
 
         return total
 
@@ -197,9 +231,10 @@ class Portfolio:
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'Portfolio':
-        wallets = {}
-        for code, wallet_data in data.get("wallets", {}).items():
-            wallets[code] = Wallet.from_dict(wallet_data)
+        wallets = {
+            sys.intern(code): Wallet.from_dict(wallet_data)
+            for code, wallet_data in data.get("wallets", {}).items()
+        }
 
         return cls(
             user_id=data["user_id"],
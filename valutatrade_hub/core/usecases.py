@@ -8,6 +8,9 @@ from ..infra.database import DatabaseManager
 from ..decorators import log_action
 from ..infra.settings import SettingsLoader
 
+# Соль для холостого хеширования при входе под несуществующим именем
+_DUMMY_SALT = "0" * 16
+
 
 class UserUseCases:
     @staticmethod
@@ -18,10 +21,15 @@ class UserUseCases:
         db = DatabaseManager()
         users = db.load_users()
 
-        if any(u["username"] == username for u in users):
-            raise ValueError(f"Имя пользователя '{username}' уже занято")
+        # Один проход по списку: проверка занятости имени и поиск максимального id
+        max_user_id = 0
+        for u in users:
+            if u["username"] == username:
+                raise ValueError(f"Имя пользователя '{username}' уже занято")
+            if u["user_id"] > max_user_id:
+                max_user_id = u["user_id"]
 
-        user_id = max((u["user_id"] for u in users), default=0) + 1
+        user_id = max_user_id + 1
         salt = User._User__generate_salt()
         hashed_password = User._User__hash_password(password, salt)
 
@@ -53,6 +61,9 @@ class UserUseCases:
 
         user_data = next((u for u in users if u["username"] == username), None)
         if not user_data:
+            # Хешируем пароль и для неизвестного имени, чтобы время ответа
+            # не отличалось от проверки пароля существующего пользователя
+            User._User__hash_password(password, _DUMMY_SALT)
             raise ValueError(f"Пользователь '{username}' не найден")
 
         user = User.from_dict(user_data)
@@ -100,12 +111,13 @@ class PortfolioUseCases:
         if amount <= 0:
             raise ValueError("'amount' должен быть положительным числом")
 
+        code = currency_code.upper()
         portfolio = PortfolioUseCases.get_portfolio(user_id)
 
         # Получаем курс из базы данных
         db = DatabaseManager()
         rates = db.load_rates()
-        rate_key = f"{currency_code.upper()}_USD"
+        rate_key = f"{code}_USD"
 
         # Проверяем актуальность курса
         settings = SettingsLoader()
@@ -124,9 +136,9 @@ class PortfolioUseCases:
         rate = rate_data["rate"]
 
         # Получаем или создаем кошелек
-        wallet = portfolio.get_wallet(currency_code.upper())
+        wallet = portfolio.get_wallet(code)
         if not wallet:
-            wallet = portfolio.add_currency(currency_code.upper())
+            wallet = portfolio.add_currency(code)
 
         wallet.deposit(amount)
 
@@ -140,10 +152,11 @@ class PortfolioUseCases:
         if amount <= 0:
             raise ValueError("'amount' должен быть положительным числом")
 
+        code = currency_code.upper()
         portfolio = PortfolioUseCases.get_portfolio(user_id)
 
         # Проверяем наличие кошелька
-        wallet = portfolio.get_wallet(currency_code.upper())
+        wallet = portfolio.get_wallet(code)
         if not wallet:
             raise ValueError(f"У вас нет кошелька '{currency_code}'. "
                              f"Добавьте валюту: она создаётся автоматически при первой покупке.")
@@ -153,13 +166,13 @@ class PortfolioUseCases:
             raise InsufficientFundsError(
                 available=wallet.balance,
                 required=amount,
-                code=currency_code.upper()
+                code=code
             )
 
         # Получаем курс из базы данных
         db = DatabaseManager()
         rates = db.load_rates()
-        rate_key = f"{currency_code.upper()}_USD"
+        rate_key = f"{code}_USD"
 
         # Проверяем актуальность курса
         settings = SettingsLoader()
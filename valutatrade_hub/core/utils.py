@@ -42,8 +42,7 @@ class SessionManager:
     @classmethod
     def get_current_user(cls) -> Optional[User]:
         """Восстановить пользователя из файла сессии"""
-        cls._ensure_session_file()
-
+        # Отсутствие файла сессии обрабатывается ниже как FileNotFoundError
         try:
             with open(cls._SESSION_FILE, 'r', encoding='utf-8') as f:
                 session_data = json.load(f)
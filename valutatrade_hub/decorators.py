@@ -34,7 +34,8 @@ def log_action(action_name: str = None, verbose: bool = False):
                     user_info['user_id'] = kwargs['user_id']
                 if 'username' in kwargs:
                     user_info['username'] = kwargs['username']
-            except: # noqa
+            except Exception:
+                # Сбор контекста для лога не должен мешать выполнению действия
                 pass
 
             action = action_name or func.__name__.upper()
@@ -62,7 +63,7 @@ def log_action(action_name: str = None, verbose: bool = False):
                 if verbose and hasattr(result, 'to_dict'):
                     log_data['result_data'] = str(result.to_dict())
 
-                logger.info(f"{action} - Успех: {log_data}")
+                logger.info("%s - Успех: %s", action, log_data)
 
                 return result
 
@@ -72,7 +73,7 @@ def log_action(action_name: str = None, verbose: bool = False):
                 log_data['error_type'] = type(e).__name__
                 log_data['error_message'] = str(e)
 
-                logger.error(f"{action} - Ошибка: {log_data}")
+                logger.error("%s - Ошибка: %s", action, log_data)
 
                 # Пробрасываем исключение дальше
                 raise
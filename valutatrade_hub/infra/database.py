@@ -4,79 +4,127 @@ from typing import Dict, List
 
 
 class DatabaseManager:
+    """Доступ к JSON-файлам данных.
+
+    load_* возвращают общий закешированный объект: изменять его можно только
+    с последующим вызовом соответствующего save_*, иначе правки увидят другие
+    читатели в этом процессе.
+    """
+
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            # Кеш разобранных файлов: путь -> ((inode, mtime_ns, size), данные)
+            cls._instance._cache = {}
+            cls._instance._initialized = False
         return cls._instance
 
     def __init__(self):
+        # __init__ вызывается при каждом DatabaseManager(), а каталог и файлы
+        # достаточно подготовить один раз за процесс
+        if self._initialized:
+            return
+
         self.data_dir = "data"
         os.makedirs(self.data_dir, exist_ok=True)
 
         # Инициализируем файлы если их нет
         self._init_files()
+        self._initialized = True
 
-    def _init_files(self):
-        default_files = {
-            "users.json": [],
-            "portfolios.json": [],
-            "rates.json": {
-                "pairs": {
-                    "EUR_USD": {"rate": 1.0786, "updated_at": "2025-10-09T10:30:00", "source": "ParserService"},
-                    "BTC_USD": {"rate": 59337.21, "updated_at": "2025-10-09T10:29:42", "source": "ParserService"},
-                    "RUB_USD": {"rate": 0.01016, "updated_at": "2025-10-09T10:31:12", "source": "ParserService"},
-                    "ETH_USD": {"rate": 3720.00, "updated_at": "2025-10-09T10:35:00", "source": "ParserService"},
-                },
-                "last_refresh": "2025-10-09T10:35:00",
-                "source": "ParserService"
+    # Содержимое файлов данных по умолчанию
+    _DEFAULT_FILES = {
+        "users.json": [],
+        "portfolios.json": [],
+        "rates.json": {
+            "pairs": {
+                "EUR_USD": {"rate": 1.0786, "updated_at": "2025-10-09T10:30:00",
+                            "source": "ParserService"},
+                "BTC_USD": {"rate": 59337.21, "updated_at": "2025-10-09T10:29:42",
+                            "source": "ParserService"},
+                "RUB_USD": {"rate": 0.01016, "updated_at": "2025-10-09T10:31:12",
+                            "source": "ParserService"},
+                "ETH_USD": {"rate": 3720.00, "updated_at": "2025-10-09T10:35:00",
+                            "source": "ParserService"},
             },
-            "exchange_rates.json": []
-        }
+            "last_refresh": "2025-10-09T10:35:00",
+            "source": "ParserService"
+        },
+        "exchange_rates.json": []
+    }
 
-        for filename, default_data in default_files.items():
+    def _init_files(self):
+        for filename in self._DEFAULT_FILES:
             filepath = os.path.join(self.data_dir, filename)
             if not os.path.exists(filepath):
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(default_data, f, indent=2, ensure_ascii=False)
+                self._write_default(filename)
+
+    def _write_default(self, filename: str):
+        """Создать файл данных с содержимым по умолчанию"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        filepath = os.path.join(self.data_dir, filename)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self._DEFAULT_FILES[filename], f, indent=2, ensure_ascii=False)
+
+    def _load_json(self, filename: str):
+        """Прочитать JSON-файл, переиспользуя разобранные данные, если файл не менялся"""
+        filepath = os.path.join(self.data_dir, filename)
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            # Файлы готовятся один раз за процесс; если файл удалили позже,
+            # восстанавливаем его так же, как при инициализации
+            if filename not in self._DEFAULT_FILES:
+                raise
+            self._write_default(filename)
+            stat = os.stat(filepath)
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        cached = self._cache.get(filepath)
+        if cached is not None and cached[0] == key:
+            return cached[1]
 
-    def load_users(self) -> List[Dict]:
-        filepath = os.path.join(self.data_dir, "users.json")
         with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        self._cache[filepath] = (key, data)
+        return data
 
-    def save_users(self, users: List[Dict]):
-        filepath = os.path.join(self.data_dir, "users.json")
+    def _save_json(self, filename: str, data):
+        """Записать JSON-файл и обновить кеш разобранных данных"""
+        filepath = os.path.join(self.data_dir, filename)
+        # Вызывающий код мог изменить закешированный объект на месте: если запись
+        # не удастся, следующее чтение должно вернуть то, что реально лежит на диске
+        self._cache.pop(filepath, None)
+        # Каталог data мог быть удален после инициализации
+        os.makedirs(self.data_dir, exist_ok=True)
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(users, f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+        stat = os.stat(filepath)
+        self._cache[filepath] = ((stat.st_ino, stat.st_mtime_ns, stat.st_size), data)
+
+    def load_users(self) -> List[Dict]:
+        return self._load_json("users.json")
+
+    def save_users(self, users: List[Dict]):
+        self._save_json("users.json", users)
 
     def load_portfolios(self) -> List[Dict]:
-        filepath = os.path.join(self.data_dir, "portfolios.json")
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self._load_json("portfolios.json")
 
     def save_portfolios(self, portfolios: List[Dict]):
-        filepath = os.path.join(self.data_dir, "portfolios.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(portfolios, f, indent=2, ensure_ascii=False)
+        self._save_json("portfolios.json", portfolios)
 
     def load_rates(self) -> Dict:
-        filepath = os.path.join(self.data_dir, "rates.json")
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self._load_json("rates.json")
 
     def save_rates(self, rates: Dict):
-        filepath = os.path.join(self.data_dir, "rates.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(rates, f, indent=2, ensure_ascii=False)
+        self._save_json("rates.json", rates)
 
     def load_exchange_rates(self) -> List[Dict]:
-        filepath = os.path.join(self.data_dir, "exchange_rates.json")
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self._load_json("exchange_rates.json")
 
     def save_exchange_rates(self, exchange_rates: List[Dict]):
-        filepath = os.path.join(self.data_dir, "exchange_rates.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(exchange_rates, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+        self._save_json("exchange_rates.json", exchange_rates)
\ No newline at end of file
@@ -3,9 +3,19 @@ import logging.handlers
 import os
 from valutatrade_hub.infra.settings import SettingsLoader
 
+_configured = False
+
 
 def setup_logging():
-    """Настройка системы логирования"""
+    """
+    Настройка системы логирования (повторные вызовы ничего не делают).
+
+    Вызывается точкой входа CLI, а не при импорте пакета.
+    """
+    global _configured
+    if _configured:
+        return logging.getLogger('valutatrade')
+
     settings = SettingsLoader()
     log_dir = settings.get("LOG_DIR", "logs")
     os.makedirs(log_dir, exist_ok=True)
@@ -43,6 +53,7 @@ def setup_logging():
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
 
+    _configured = True
     return logger
 
 
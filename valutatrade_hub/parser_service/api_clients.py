@@ -23,19 +23,22 @@ class CoinGeckoClient(BaseApiClient):
 
     def fetch_rates(self) -> Dict[str, float]:
         try:
-            # Формируем список ID криптовалют
-            crypto_ids = []
-            for code in self.config.CRYPTO_CURRENCIES:
-                if code in self.config.CRYPTO_ID_MAP:
-                    crypto_ids.append(self.config.CRYPTO_ID_MAP[code])
+            base = self.config.BASE_CURRENCY
+            vs_currency = base.lower()
 
-            if not crypto_ids:
+            # Пары (код, ID CoinGecko) для отслеживаемых криптовалют — вычисляются один раз
+            id_map = self.config.CRYPTO_ID_MAP
+            tracked = [
+                (code, id_map[code]) for code in self.config.CRYPTO_CURRENCIES if code in id_map
+            ]
+
+            if not tracked:
                 return {}
 
             # Формируем параметры запроса
             params = {
-                'ids': ','.join(crypto_ids),
-                'vs_currencies': self.config.BASE_CURRENCY.lower()
+                'ids': ','.join(coin_id for _, coin_id in tracked),
+                'vs_currencies': vs_currency
             }
 
             # Отправляем запрос
@@ -53,13 +56,11 @@ class CoinGeckoClient(BaseApiClient):
 
             # Преобразуем в нужный формат
             rates = {}
-            for code in self.config.CRYPTO_CURRENCIES:
-                if code in self.config.CRYPTO_ID_MAP:
-                    coin_id = self.config.CRYPTO_ID_MAP[code]
-                    if coin_id in data:
-                        rate = data[coin_id].get(self.config.BASE_CURRENCY.lower())
-                        if rate:
-                            rates[f"{code}_{self.config.BASE_CURRENCY}"] = rate
+            for code, coin_id in tracked:
+                if coin_id in data:
+                    rate = data[coin_id].get(vs_currency)
+                    if rate:
+                        rates[f"{code}_{base}"] = rate
 
             return rates
 
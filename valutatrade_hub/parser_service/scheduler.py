@@ -36,7 +36,7 @@ class RatesScheduler:
             name="RatesScheduler"
         )
         self._thread.start()
-        self.logger.info(f"Планировщик запущен с интервалом {interval_minutes} минут")
+        self.logger.info("Планировщик запущен с интервалом %s минут", interval_minutes)
 
     def stop(self):
         """Остановить планировщик"""
@@ -57,16 +57,16 @@ class RatesScheduler:
                 updated_count = self.updater.run_update()
 
                 if updated_count > 0:
-                    self.logger.info(f"Обновлено {updated_count} курсов")
+                    self.logger.info("Обновлено %d курсов", updated_count)
                 else:
                     self.logger.warning("Не удалось обновить курсы")
 
                 # Рассчитываем время следующего обновления
                 next_update = datetime.now() + timedelta(minutes=interval_minutes)
-                self.logger.info(f"Следующее обновление в {next_update.strftime('%H:%M:%S')}")
+                self.logger.info("Следующее обновление в %s", next_update.strftime('%H:%M:%S'))
 
             except Exception as e:
-                self.logger.error(f"Ошибка в планировщике: {e}")
+                self.logger.error("Ошибка в планировщике: %s", e)
 
             # Ожидаем до следующего обновления или команды остановки
             for _ in range(interval_seconds * 10):  # Проверяем каждые 0.1 секунду
@@ -80,14 +80,14 @@ class RatesScheduler:
             updated_count = self.updater.run_update()
 
             if updated_count > 0:
-                self.logger.info(f"Обновлено {updated_count} курсов")
+                self.logger.info("Обновлено %d курсов", updated_count)
                 return updated_count
             else:
                 self.logger.warning("Не удалось обновить курсы")
                 return 0
 
         except Exception as e:
-            self.logger.error(f"Ошибка при обновлении: {e}")
+            self.logger.error("Ошибка при обновлении: %s", e)
             return 0
 
     def is_running(self) -> bool:
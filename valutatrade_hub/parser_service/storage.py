@@ -19,8 +19,8 @@ class RatesStorage:
         os.makedirs(os.path.dirname(self.config.RATES_FILE_PATH), exist_ok=True)
         os.makedirs(os.path.dirname(self.config.HISTORY_FILE_PATH), exist_ok=True)
 
-    def save_current_rates(self, rates: Dict[str, float], source: str = "ParserService"):
-        """Сохранить текущие курсы в rates.json"""
+    def save_current_rates(self, rates: Dict[str, float], source: str = "ParserService") -> str:
+        """Сохранить текущие курсы в rates.json, вернуть метку времени обновления"""
         timestamp = datetime.now().isoformat()
 
         # Формируем данные для сохранения
@@ -57,9 +57,29 @@ class RatesStorage:
                 os.unlink(temp_file)
             raise
 
-    def save_to_history(self, rates: Dict[str, float], source: str, meta: Dict = None):
+        return timestamp
+
+    @staticmethod
+    def _history_entries(rates: Dict[str, float], source: str, meta: Dict, timestamp: str):
+        """Сформировать записи истории по одной на каждую пару"""
+        id_suffix = timestamp.replace(':', '-').replace('.', '-')
+
+        for pair, rate in rates.items():
+            from_currency, to_currency = pair.split('_', 1)
+            yield {
+                "id": f"{pair}_{id_suffix}",
+                "from_currency": from_currency,
+                "to_currency": to_currency,
+                "rate": rate,
+                "timestamp": timestamp,
+                "source": source,
+                "meta": meta
+            }
+
+    def save_to_history(self, rates: Dict[str, float], source: str, meta: Dict = None,
+                        timestamp: str = None):
         """Сохранить курсы в историю (exchange_rates.json)"""
-        timestamp = datetime.now().isoformat()
+        timestamp = timestamp or datetime.now().isoformat()
 
         try:
             # Загружаем существующую историю
@@ -70,17 +90,7 @@ class RatesStorage:
                 history = []
 
             # Добавляем новые записи
-            for pair, rate in rates.items():
-                history_entry = {
-                    "id": f"{pair}_{timestamp.replace(':', '-').replace('.', '-')}",
-                    "from_currency": pair.split('_')[0],
-                    "to_currency": pair.split('_')[1],
-                    "rate": rate,
-                    "timestamp": timestamp,
-                    "source": source,
-                    "meta": meta or {}
-                }
-                history.append(history_entry)
+            history.extend(self._history_entries(rates, source, meta or {}, timestamp))
 
             # Сохраняем историю
             with open(self.config.HISTORY_FILE_PATH, 'w', encoding='utf-8') as f:
@@ -1,4 +1,6 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
 
 from .config import ParserConfig
 from .api_clients import CoinGeckoClient, ExchangeRateApiClient
@@ -13,6 +15,13 @@ class RatesUpdater:
         self.config = config or ParserConfig()
         self.storage = RatesStorage(self.config)
         self.logger = logging.getLogger('valutatrade.parser')
+        # Метка времени последнего успешного сохранения курсов
+        self.last_refresh = None
+
+    def _fetch(self, name: str, client_cls) -> Dict[str, float]:
+        """Получить курсы от одного источника"""
+        self.logger.info("Fetching from %s...", name)
+        return client_cls(self.config).fetch_rates()
 
     def run_update(self, source: str = None) -> int:
         """Запустить обновление курсов"""
@@ -21,44 +30,46 @@ class RatesUpdater:
         all_rates = {}
         errors = []
 
-        # Обрабатываем CoinGecko
+        clients = []
         if not source or source.lower() == 'coingecko':
-            try:
-                self.logger.info("Fetching from CoinGecko...")
-                client = CoinGeckoClient(self.config)
-                rates = client.fetch_rates()
-                all_rates.update(rates)
-                self.logger.info(f"CoinGecko OK ({len(rates)} rates)")
-            except ApiRequestError as e:
-                error_msg = f"Failed to fetch from CoinGecko: {str(e)}"
-                self.logger.error(error_msg)
-                errors.append(error_msg)
-
-        # Обрабатываем ExchangeRate-API
+            clients.append(('CoinGecko', CoinGeckoClient))
         if not source or source.lower() == 'exchangerate':
-            try:
-                self.logger.info("Fetching from ExchangeRate-API...")
-                client = ExchangeRateApiClient(self.config)
-                rates = client.fetch_rates()
-                all_rates.update(rates)
-                self.logger.info(f"ExchangeRate-API OK ({len(rates)} rates)")
-            except ApiRequestError as e:
-                error_msg = f"Failed to fetch from ExchangeRate-API: {str(e)}"
-                self.logger.error(error_msg)
-                errors.append(error_msg)
+            clients.append(('ExchangeRate-API', ExchangeRateApiClient))
+
+        # Источники независимы — запрашиваем их параллельно, чтобы время
+        # ожидания сети не складывалось; результаты разбираем в исходном порядке
+        if clients:
+            with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+                futures = [
+                    (name, pool.submit(self._fetch, name, client_cls))
+                    for name, client_cls in clients
+                ]
+
+            for name, future in futures:
+                try:
+                    rates = future.result()
+                    all_rates.update(rates)
+                    self.logger.info("%s OK (%d rates)", name, len(rates))
+                except ApiRequestError as e:
+                    error_msg = f"Failed to fetch from {name}: {str(e)}"
+                    self.logger.error(error_msg)
+                    errors.append(error_msg)
 
         # Сохраняем результаты
         if all_rates:
             try:
-                self.logger.info(f"Writing {len(all_rates)} rates to {self.config.RATES_FILE_PATH}...")
-                self.storage.save_current_rates(all_rates, "ParserService")
-                self.storage.save_to_history(all_rates, "ParserService")
+                self.logger.info("Writing %d rates to %s...",
+                                 len(all_rates), self.config.RATES_FILE_PATH)
+                # Одна метка времени для rates.json, истории и вывода CLI
+                timestamp = self.storage.save_current_rates(all_rates, "ParserService")
+                self.storage.save_to_history(all_rates, "ParserService", timestamp=timestamp)
+                self.last_refresh = timestamp
 
                 if errors:
-                    self.logger.warning(f"Update completed with {len(errors)} errors")
+                    self.logger.warning("Update completed with %d errors", len(errors))
                     return len(all_rates)
                 else:
-                    self.logger.info(f"Update successful. Total rates updated: {len(all_rates)}")
+                    self.logger.info("Update successful. Total rates updated: %d", len(all_rates))
                     return len(all_rates)
 
             except Exception as e: